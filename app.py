@@ -4,9 +4,10 @@ import ttkbootstrap as ttk_boot
 from ttkbootstrap.constants import *
 import json
 import os
+import re
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable
 import openpyxl
 from openpyxl.cell.cell import MergedCell
 import subprocess
@@ -14,55 +15,84 @@ import sys
 from datetime import datetime
 import traceback
 import shutil
-from threading import Thread
+from threading import Thread, Lock, Event
+from concurrent.futures import ThreadPoolExecutor
+import queue
+from collections import Counter
+from functools import lru_cache
 import gc
 import time
-import psutil
 from logic.parser import ExcelParser
 from logic.config_manager import ConfigurationManager
 from logic.mapper import ColumnMapper
-from logic.transfer import ExcelTransferEngine, parse_skip_rows_string
+from logic.transfer import ExcelTransferEngine, TransferCancelled, parse_skip_rows_string
 from gui.widgets import (ScrollableFrame, AboutDialog, PreviewDialog, 
                          DetectionConfigDialog, show_custom_info, 
                          show_custom_error, show_custom_warning, 
                          show_custom_question)
 
 # Cấu hình logging
+# delay=True defers opening app.log until the first record is emitted,
+# keeping the file open off the import/startup path
 logging.basicConfig(
-    filename='app.log',
+    handlers=[logging.FileHandler('app.log', encoding='utf-8', delay=True)],
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
+    format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+@lru_cache(maxsize=16)
+def compile_keyword_pattern(keywords_str: str) -> Optional["re.Pattern"]:
+    """
+    Compiles a comma-separated keyword string into one case-insensitive alternation.
+    Keywords are de-duplicated and tried longest first; results are cached per string.
+    """
+    keywords = {k.strip().lower() for k in keywords_str.split(',') if k.strip()}
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)), re.IGNORECASE)
+
+def stat_or_none(file_path: str) -> Optional[os.stat_result]:
+    """Returns the file's stat result, or None when it is missing or unreachable (one metadata round-trip)."""
+    try:
+        return os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+
 class FileHandleManager:
     """Manages file handles to prevent Excel file locking issues"""
     
     @staticmethod
-    def force_release_handles():
-        """Force garbage collection and release file handles"""
-        for _ in range(3):
-            gc.collect()
-            time.sleep(0.05)
+    def force_release_handles_slow():
+        """Force a full garbage collection and give the OS time to release file handles"""
+        # One full (generation 2) pass already finalizes every unreachable workbook;
+        # repeating it only re-walks the same surviving objects.
+        gc.collect(2)
+        time.sleep(0.05)
     
     @staticmethod
     def is_file_locked(file_path: str) -> bool:
         """Check if a file is currently locked by another process"""
+        # A bare read/write descriptor is enough to hit a sharing violation; no buffered file object needed
         try:
-            with open(file_path, 'r+b'):
-                return False
-        except (IOError, OSError):
+            fd = os.open(file_path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        except OSError:
             return True
+        os.close(fd)
+        return False
     
     @staticmethod
     def wait_for_file_release(file_path: str, max_wait_seconds: int = 5) -> bool:
         """Wait for a file to be released by other processes"""
-        start_time = time.time()
-        while time.time() - start_time < max_wait_seconds:
+        # The lock belongs to another process, so our own GC cannot help; just back off
+        # exponentially (0.1 s, 0.2 s, 0.4 s ... capped at 1 s) between probes.
+        # Monotonic clock: a wall-clock adjustment cannot cut the wait short or extend it
+        deadline = time.monotonic() + max_wait_seconds
+        delay = 0.1
+        while time.monotonic() < deadline:
             if not FileHandleManager.is_file_locked(file_path):
                 return True
-            FileHandleManager.force_release_handles()
-            time.sleep(0.2)
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
         return False
     
     @staticmethod
@@ -70,14 +100,26 @@ class FileHandleManager:
         """Get list of processes that are using the specified file"""
         processes = []
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'open_files']):
+            # psutil is only needed on this rare locked-file path, so it is imported here
+            # instead of at startup
+            import psutil
+            # Identify the target by (device, inode) once instead of stat()ing it for every open file
+            target_stat = os.stat(file_path)
+            target_id = (target_stat.st_dev, target_stat.st_ino)
+            # Without attrs, process_iter does not pre-fetch open files for every process;
+            # they are only listed per process below, inside oneshot() to share the lookups
+            for proc in psutil.process_iter():
                 try:
-                    if proc.info['open_files']:
-                        for file_info in proc.info['open_files']:
-                            if os.path.samefile(file_info.path, file_path):
-                                processes.append({'pid': proc.info['pid'], 'name': proc.info['name']})
+                    with proc.oneshot():
+                        for file_info in proc.open_files():
+                            try:
+                                file_stat = os.stat(file_info.path)
+                            except OSError:
+                                continue
+                            if (file_stat.st_dev, file_stat.st_ino) == target_id:
+                                processes.append({'pid': proc.pid, 'name': proc.name()})
                                 break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                except (psutil.Error, OSError):
                     continue
         except Exception as e:
             logging.warning(f"Error checking file usage: {e}")
@@ -125,19 +167,50 @@ class ExcelDataMapper:
         self.respect_cell_protection = tk.BooleanVar(value=True)
         self.respect_formulas = tk.BooleanVar(value=True)
         self.detection_keywords = tk.StringVar(value="total,sum,cộng,tổng,thành tiền")
+        self._keyword_re = None
+        self.detection_keywords.trace_add("write", self._compile_detection_keywords)
+        self._compile_detection_keywords()
         
         self.source_columns = {}
         self.dest_columns = {}
         self.mapping_combos = {}
+        self._mapping_rows = [] # (source label, arrow label, destination combobox) per mapping row
+        self._app_settings = {}
+        self._persisted_app_settings = None # Last settings known to be on disk; None forces the next write
+        self._settings_after_id = None # Pending debounced settings write
+        self._header_cache = {} # file path -> ((mtime, size, start_row, end_row), columns)
+        self._access_cache = {} # file path -> (monotonic time of last successful probe, (mtime, size))
+        self._zone_scan_cache = {} # dest path -> ((mtime, size, zone settings...), (end_limit, protected_skipped))
         
         self.config_manager = ConfigurationManager()
         self.column_mapper = ColumnMapper()
+        self._settings_lock = Lock()
+        self._status_flush_pending = False
+        self._progress_queue = queue.Queue()
+        self._last_progress_value = None # Last percentage queued by the worker thread
+        self._cancel_event = None # Set while a transfer is running; cancel_transfer() signals it
+
+        # Summary of the current settings, rebuilt only after one of its variables changes
+        self._settings_cache = {}
+        for var in (self.source_file, self.dest_file, self.sort_column, self.dest_write_start_row,
+                    self.dest_write_end_row, self.dest_skip_rows, self.respect_cell_protection, self.respect_formulas):
+            var.trace_add("write", self._invalidate_settings_cache)
+
+        # Any exception escaping a Tk callback is logged and shown in one place
+        self.root.report_callback_exception = self._report_callback_exception
 
         self.setup_menu()
         self.setup_gui()
         self.load_app_settings()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(50, self._drain_progress_queue)
         
+    def _report_callback_exception(self, exc_type, exc_value, exc_tb):
+        """Handles exceptions raised by Tk callbacks that no method caught itself."""
+        details = "".join(traceback.format_exception(exc_type, exc_value, exc_tb))
+        self.log_error(f"Unhandled error in GUI callback: {exc_value}\n{details}")
+        show_custom_error(self.root, self, "Error", f"An unexpected error occurred:\n\n{exc_value}")
+
     def setup_menu(self):
         menubar_frame = ttk_boot.Frame(self.root)
         menubar_frame.pack(fill=X, side=TOP, padx=5, pady=(1, 0))
@@ -152,7 +225,7 @@ class ExcelDataMapper:
         file_menu.add_command(label="Open Destination Folder", command=self.open_dest_folder)
         file_menu.add_command(label="Force Release File Handles", command=self.force_release_excel_handles)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_closing)
         create_menu_button("File", file_menu)
 
         settings_menu = tk.Menu(self.root, tearoff=0)
@@ -189,6 +262,10 @@ class ExcelDataMapper:
         self.load_button.pack(side=LEFT, padx=5)
         self.execute_button = ttk_boot.Button(action_frame, text="Execute Transfer", command=self.execute_transfer, bootstyle=PRIMARY)
         self.execute_button.pack(side=RIGHT, padx=0)
+        # Only enabled while a transfer is running
+        self.cancel_button = ttk_boot.Button(action_frame, text="Cancel", command=self.cancel_transfer,
+                                             bootstyle="outline-danger", state=DISABLED)
+        self.cancel_button.pack(side=RIGHT, padx=(5, 0))
         self.preview_button = ttk_boot.Button(action_frame, text="Preview Transfer", command=self.preview_transfer, bootstyle="outline-secondary")
         self.preview_button.pack(side=RIGHT, padx=5)
 
@@ -264,6 +341,10 @@ class ExcelDataMapper:
         mapping_container.pack(fill=BOTH, expand=True)
         self.mapping_scroll_frame = ScrollableFrame(mapping_container)
         self.mapping_scroll_frame.pack(fill=BOTH, expand=True)
+
+        # Buttons that are disabled while a transfer is running
+        self._controls = (self.execute_button, self.load_button, self.save_button, self.load_cols_button, self.preview_button)
+        self._controls_state = NORMAL
     
     def browse_source_file(self):
         filename = filedialog.askopenfilename(title="Select Source Excel file", filetypes=[("Excel files", "*.xlsx *.xls")])
@@ -280,7 +361,8 @@ class ExcelDataMapper:
     def force_release_excel_handles(self):
         try:
             self.source_columns, self.dest_columns = {}, {}
-            FileHandleManager.force_release_handles()
+            self._access_cache.clear()
+            FileHandleManager.force_release_handles_slow()
             self.update_status("File handles released")
             self.log_info("Forced release of Excel file handles")
             show_custom_info(self.root, self, "Info", "Excel file handles have been released.")
@@ -288,92 +370,188 @@ class ExcelDataMapper:
             self.log_error(f"Error forcing handle release: {str(e)}")
             show_custom_error(self.root, self, "Error", f"Error releasing handles: {str(e)}")
     
-    def check_file_accessibility(self, file_path: str) -> bool:
-        try:
-            if not os.path.exists(file_path): return False
-            if FileHandleManager.is_file_locked(file_path):
-                self.update_status(f"Waiting for file to be released: {os.path.basename(file_path)}")
-                if not FileHandleManager.wait_for_file_release(file_path, max_wait_seconds=10):
-                    processes = FileHandleManager.get_processes_using_file(file_path)
-                    if processes:
-                        process_names = [p['name'] for p in processes]
-                        self.log_error(f"File locked by processes: {', '.join(process_names)}")
-                        show_custom_warning(self.root, self, "File Locked", f"File is locked by: {', '.join(process_names)}\nPlease close these applications and try again.")
-                    return False
-            return True
-        except Exception as e:
-            self.log_error(f"Error checking file accessibility: {str(e)}")
-            return False
+    def check_file_accessibility(self, file_path: str, on_wait: Callable[[str], None]) -> Optional[str]:
+        """
+        Returns None when the file exists and is not locked, otherwise the reason it cannot be used
+        ("" when there is nothing to add). Touches no widgets, so it can run on a worker thread;
+        on_wait is called with a status message before waiting for a lock to clear.
+        """
+        stat = stat_or_none(file_path)
+        if stat is None:
+            return ""
+        # A file found accessible moments ago (same operation, unchanged) is not probed again
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._access_cache.get(file_path)
+        if cached and cached[1] == signature and time.monotonic() - cached[0] < 1.0:
+            return None
+        if FileHandleManager.is_file_locked(file_path):
+            on_wait(f"Waiting for file to be released: {os.path.basename(file_path)}")
+            if not FileHandleManager.wait_for_file_release(file_path, max_wait_seconds=10):
+                processes = FileHandleManager.get_processes_using_file(file_path)
+                if processes:
+                    process_names = ', '.join(p['name'] for p in processes)
+                    self.log_error(f"File locked by processes: {process_names}")
+                    return f"File is locked by: {process_names}\nPlease close these applications and try again."
+                return ""
+        self._access_cache[file_path] = (time.monotonic(), signature)
+        return None
     
     def get_excel_columns(self, file_path, start_row, end_row):
         try:
-            FileHandleManager.force_release_handles()
-            with ExcelParser(file_path) as parser:
-                headers = parser.get_headers(start_row, end_row)
-                return {name: index for name, index in headers.items() if name and str(name).strip()}
+            # Reuse the last parse when neither the file nor the header rows changed
+            stat = os.stat(file_path)
+            signature = (stat.st_mtime_ns, stat.st_size, start_row, end_row)
+            cached = self._header_cache.get(file_path)
+            if cached and cached[0] == signature:
+                return dict(cached[1])
+
+            # Then the layout saved on disk by an earlier session for this exact file version
+            disk_key = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}|{start_row}|{end_row}"
+            columns = self.config_manager.load_cached_headers(disk_key)
+            if columns is not None:
+                columns = {sys.intern(name): index for name, index in columns.items()}
+            else:
+                with ExcelParser(file_path) as parser:
+                    headers = parser.get_headers(start_row, end_row)
+                    # Interned names are shared by the column dicts, mapping_combos keys and Combobox values
+                    columns = {sys.intern(str(name)): index for name, index in headers.items() if name and str(name).strip()}
+                self.config_manager.save_cached_headers(disk_key, columns)
+            self._header_cache[file_path] = (signature, columns)
+            return dict(columns)
         except Exception as e:
             self.log_error(f"Error reading Excel columns with parser: {str(e)}")
             raise
-        finally:
-            FileHandleManager.force_release_handles()
 
-    def safe_load_columns(self, saved_sort_col: Optional[str] = None, apply_suggestions: bool = True):
+    def safe_load_columns(self, saved_sort_col: Optional[str] = None, apply_suggestions: bool = True,
+                          on_loaded: Optional[Callable[[], None]] = None):
+        """
+        Loads source and destination columns. The workbooks are parsed on a worker thread so the
+        window stays responsive; on_loaded runs on the GUI thread once the mapping widgets exist.
+        """
         try:
-            if not self.source_file.get() or not self.dest_file.get():
+            source_path, dest_path = self.source_file.get(), self.dest_file.get()
+            if not source_path or not dest_path:
                 show_custom_warning(self.root, self, "Warning", "Please select both source and destination files first.")
                 return
-            if not self.check_file_accessibility(self.source_file.get()):
-                show_custom_error(self.root, self, "Error", f"Cannot access source file: {self.source_file.get()}")
-                return
-            if not self.check_file_accessibility(self.dest_file.get()):
-                show_custom_error(self.root, self, "Error", f"Cannot access destination file: {self.dest_file.get()}")
-                return
             
-            self.force_release_excel_handles()
+            self.source_columns, self.dest_columns = {}, {}
             self.update_status("Loading columns...")
-            
-            self.source_columns = self.get_excel_columns(self.source_file.get(), self.source_header_start_row.get(), self.source_header_end_row.get())
-            time.sleep(0.1)
-            self.dest_columns = self.get_excel_columns(self.dest_file.get(), self.dest_header_start_row.get(), self.dest_header_end_row.get())
-            
+            self.disable_controls()
+
+            # Tk variables are read here; the worker only receives plain values
+            source_args = (source_path, self.source_header_start_row.get(), self.source_header_end_row.get())
+            dest_args = (dest_path, self.dest_header_start_row.get(), self.dest_header_end_row.get())
+            load_thread = Thread(target=self._load_columns_thread,
+                                 args=(source_args, dest_args, saved_sort_col, apply_suggestions, on_loaded),
+                                 daemon=True)
+            load_thread.start()
+        except Exception as e:
+            self.log_error(f"Error loading columns: {str(e)}")
+            show_custom_error(self.root, self, "Error", f"Failed to load columns: {str(e)}")
+            self.update_status("Error loading columns")
+            self.enable_controls()
+
+    def _load_columns_thread(self, source_args, dest_args, saved_sort_col, apply_suggestions, on_loaded):
+        try:
+            # Waiting for a locked file happens here, off the GUI thread
+            for label, file_path in (("source", source_args[0]), ("destination", dest_args[0])):
+                problem = self.check_file_accessibility(
+                    file_path, lambda message: self.root.after(0, self.update_status, message, True))
+                if problem is not None:
+                    self.root.after(0, self._on_file_inaccessible, label, file_path, problem)
+                    return
+            if source_args == dest_args:
+                source_columns = self.get_excel_columns(*source_args)
+                dest_columns = dict(source_columns)
+            else:
+                # The two workbooks are independent; parse them side by side (inflating and XML parsing
+                # release the GIL part of the time). No Tk calls happen inside the pool.
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    source_future = pool.submit(self.get_excel_columns, *source_args)
+                    dest_future = pool.submit(self.get_excel_columns, *dest_args)
+                    source_columns = source_future.result()
+                    dest_columns = dest_future.result()
+            self.root.after(0, self._apply_loaded_columns, source_columns, dest_columns,
+                            saved_sort_col, apply_suggestions, on_loaded)
+        except Exception as e:
+            self.root.after(0, self._on_load_columns_error, e)
+
+    def _apply_loaded_columns(self, source_columns, dest_columns, saved_sort_col, apply_suggestions, on_loaded):
+        try:
+            self.source_columns, self.dest_columns = source_columns, dest_columns
             if not self.source_columns or not self.dest_columns:
                 show_custom_error(self.root, self, "Error", "Could not load columns. Please check file paths and header row numbers.")
+                self.update_status("Error loading columns")
                 return
             
-            source_keys = list(self.source_columns.keys())
-            self.sort_combo['values'] = source_keys
-            if saved_sort_col and saved_sort_col in source_keys:
+            self.sort_combo['values'] = tuple(self.source_columns)
+            if saved_sort_col and saved_sort_col in self.source_columns:
                 self.sort_column.set(saved_sort_col)
             
             self.create_mapping_widgets(apply_suggestions=apply_suggestions)
             self.update_status(f"Loaded {len(self.source_columns)} source and {len(self.dest_columns)} destination columns")
             self.log_info("Columns loaded successfully")
+            if on_loaded:
+                on_loaded()
         except Exception as e:
-            self.log_error(f"Error loading columns: {str(e)}")
-            show_custom_error(self.root, self, "Error", f"Failed to load columns: {str(e)}")
-            self.update_status("Error loading columns")
+            self._on_load_columns_error(e)
         finally:
-            FileHandleManager.force_release_handles()
+            self.enable_controls()
+
+    def _on_file_inaccessible(self, label: str, file_path: str, problem: str):
+        message = f"Cannot access {label} file: {file_path}"
+        show_custom_error(self.root, self, "Error", f"{message}\n\n{problem}" if problem else message)
+        self.update_status("Error loading columns")
+        self.enable_controls()
+
+    def _on_load_columns_error(self, error):
+        self.log_error(f"Error loading columns: {str(error)}")
+        show_custom_error(self.root, self, "Error", f"Failed to load columns: {str(error)}")
+        self.update_status("Error loading columns")
+        self.enable_controls()
     
     def create_mapping_widgets(self, apply_suggestions: bool = True):
-        for widget in self.mapping_scroll_frame.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        self.mapping_scroll_frame.scrollable_frame.columnconfigure(0, weight=1)
-        self.mapping_scroll_frame.scrollable_frame.columnconfigure(2, weight=1)
-        ttk_boot.Label(self.mapping_scroll_frame.scrollable_frame, text="Source Column", font="-weight bold").grid(row=0, column=0, sticky=W, padx=5, pady=(2, 2))
-        ttk_boot.Label(self.mapping_scroll_frame.scrollable_frame, text="Destination Column", font="-weight bold").grid(row=0, column=2, sticky=W, padx=5, pady=(2, 2))
-        
+        # Build the destination choices once and share them between all rows
+        dest_names = tuple(self.dest_columns)
+        dest_values = ("",) + dest_names
+        # Score every source column in one pass so destination names are tokenized only once
+        suggestions = self.column_mapper.suggest_all(self.source_columns, dest_names) if apply_suggestions else {}
+        frame = self.mapping_scroll_frame.scrollable_frame
+        if not self._mapping_rows:
+            # Nothing from an earlier load (only the header, or an empty frame): start clean
+            for widget in frame.winfo_children():
+                widget.destroy()
+            frame.columnconfigure(0, weight=1)
+            frame.columnconfigure(2, weight=1)
+            ttk_boot.Label(frame, text="Source Column", font="-weight bold").grid(row=0, column=0, sticky=W, padx=5, pady=(2, 2))
+            ttk_boot.Label(frame, text="Destination Column", font="-weight bold").grid(row=0, column=2, sticky=W, padx=5, pady=(2, 2))
+
+        # Reuse the rows built by the previous load and only create or destroy the difference,
+        # so reloading the same (or a similar) file does not rebuild every widget
         self.mapping_combos = {}
-        for i, source_col_name in enumerate(self.source_columns.keys(), start=1):
-            ttk_boot.Label(self.mapping_scroll_frame.scrollable_frame, text=source_col_name, anchor=W).grid(row=i, column=0, sticky=EW, padx=5, pady=2)
-            ttk_boot.Label(self.mapping_scroll_frame.scrollable_frame, text="→").grid(row=i, column=1, sticky=W, padx=5)
-            dest_combo = ttk_boot.Combobox(self.mapping_scroll_frame.scrollable_frame, values=[""] + list(self.dest_columns.keys()), width=60)
-            dest_combo.grid(row=i, column=2, sticky=EW, padx=5, pady=2)
-            if apply_suggestions:
-                suggested = self.column_mapper.suggest_mapping(source_col_name, list(self.dest_columns.keys()))
-                if suggested: dest_combo.set(suggested)
+        for i, source_col_name in enumerate(self.source_columns, start=1):
+            if i <= len(self._mapping_rows):
+                source_label, dest_combo = self._mapping_rows[i - 1][0], self._mapping_rows[i - 1][2]
+                if source_label.cget("text") != source_col_name:
+                    source_label.configure(text=source_col_name)
+                dest_combo.configure(values=dest_values)
+                dest_combo.set("")
+            else:
+                source_label = ttk_boot.Label(frame, text=source_col_name, anchor=W)
+                source_label.grid(row=i, column=0, sticky=EW, padx=5, pady=2)
+                arrow_label = ttk_boot.Label(frame, text="→")
+                arrow_label.grid(row=i, column=1, sticky=W, padx=5)
+                dest_combo = ttk_boot.Combobox(frame, values=dest_values, width=60)
+                dest_combo.grid(row=i, column=2, sticky=EW, padx=5, pady=2)
+                self._mapping_rows.append((source_label, arrow_label, dest_combo))
+            suggested = suggestions.get(source_col_name)
+            if suggested: dest_combo.set(suggested)
             self.mapping_combos[source_col_name] = dest_combo
+
+        for row_widgets in self._mapping_rows[len(self.source_columns):]:
+            for widget in row_widgets:
+                widget.destroy()
+        del self._mapping_rows[len(self.source_columns):]
     
     def save_config(self):
         try:
@@ -389,7 +567,7 @@ class ExcelDataMapper:
             )
             if not config_file_path: return
 
-            mappings = {source_col: combo.get() for source_col, combo in self.mapping_combos.items() if combo.get()}
+            mappings = self._selected_mappings()
             
             job_config = {
                 #"source_file": self.source_file.get(), "dest_file": self.dest_file.get(),
@@ -437,11 +615,10 @@ class ExcelDataMapper:
             
             if self.source_file.get() and self.dest_file.get():
                 saved_sort_col = config.get("sort_column", "")
-                self.safe_load_columns(saved_sort_col=saved_sort_col, apply_suggestions=False)
                 mappings = config.get("mapping", {})
-                for source_col, dest_col in mappings.items():
-                    if source_col in self.mapping_combos:
-                        self.mapping_combos[source_col].set(dest_col)
+                # Columns load in the background; the saved mappings are applied once they are ready
+                self.safe_load_columns(saved_sort_col=saved_sort_col, apply_suggestions=False,
+                                       on_loaded=lambda: self._apply_saved_mappings(mappings))
 
             self.save_app_settings() # Update last used files
             self.update_status(f"Job configuration loaded from {os.path.basename(config_file_path)}")
@@ -450,10 +627,17 @@ class ExcelDataMapper:
             self.log_error(f"Error in load_config: {str(e)}")
             show_custom_error(self.root, self, "Error", f"Failed to load job configuration: {str(e)}")
     
+    def _apply_saved_mappings(self, mappings: dict):
+        for source_col, dest_col in mappings.items():
+            if source_col in self.mapping_combos:
+                self.mapping_combos[source_col].set(dest_col)
+
     def load_app_settings(self):
         """Loads global application settings at startup."""
         try:
             settings = self.config_manager.load_app_settings()
+            self._app_settings = settings # Kept so saves merge into it instead of re-reading the file
+            self._persisted_app_settings = dict(settings)
             
             # Restore last used theme
             new_theme = settings.get("theme", "flatly")
@@ -464,40 +648,103 @@ class ExcelDataMapper:
             # Restore last used keywords
             self.detection_keywords.set(settings.get("detection_keywords", "total,sum,cộng,tổng,thành tiền"))
 
-            # Restore last used file paths if they exist
+            # Restore last used file paths if they exist. The existence check can block on
+            # unreachable network drives, so it runs off the GUI thread once the window is idle.
             last_source = settings.get("last_source_file", "")
-            if os.path.exists(last_source):
-                self.source_file.set(last_source)
-            
             last_dest = settings.get("last_dest_file", "")
-            if os.path.exists(last_dest):
-                self.dest_file.set(last_dest)
+            self.root.after_idle(self._restore_last_files, last_source, last_dest)
 
             self.log_info("Application settings loaded.")
 
         except Exception as e:
             self.log_error(f"Error loading application settings: {str(e)}")
             # Don't show a popup for this, just log it.
+
+    def _restore_last_files(self, last_source: str, last_dest: str):
+        Thread(target=self._restore_last_files_thread, args=(last_source, last_dest), daemon=True).start()
+
+    def _restore_last_files_thread(self, last_source: str, last_dest: str):
+        existing = [path if path and stat_or_none(path) is not None else "" for path in (last_source, last_dest)]
+        self.root.after(0, self._apply_last_files, *existing)
+
+    def _apply_last_files(self, last_source: str, last_dest: str):
+        # Don't overwrite a file the user already picked while the check was running
+        if last_source and not self.source_file.get():
+            self.source_file.set(last_source)
+        if last_dest and not self.dest_file.get():
+            self.dest_file.set(last_dest)
             
     def save_app_settings(self):
-        """Saves global application settings."""
+        """
+        Schedules a save of the global application settings. Calls made within 500 ms of
+        each other are coalesced into a single write.
+        """
+        if self._settings_after_id is not None:
+            self.root.after_cancel(self._settings_after_id)
+        self._settings_after_id = self.root.after(500, self._flush_settings_now)
+
+    def _flush_settings_now(self) -> Optional[Thread]:
+        """
+        Saves global application settings immediately.
+        The Tk variables are read here on the GUI thread; the file write runs on a
+        daemon thread so slow disks do not stall the UI. Returns the writer thread,
+        or None when the settings on disk are already up to date.
+        """
+        self._settings_after_id = None
         try:
-            settings = {
+            # Start from the settings loaded at startup so keys this version doesn't manage are kept
+            settings = dict(self._app_settings)
+            settings.update({
                 "theme": self.current_theme,
                 "detection_keywords": self.detection_keywords.get(),
                 "last_source_file": self.source_file.get(),
                 "last_dest_file": self.dest_file.get()
-            }
-            self.config_manager.save_app_settings(settings)
-            self.log_info("Application settings saved.")
+            })
+            self._app_settings = settings
+            # Nothing changed since the last write (or since startup): skip the disk write
+            if settings == self._persisted_app_settings:
+                return None
+            self._persisted_app_settings = settings
+            save_thread = Thread(target=self._save_app_settings_thread, args=(settings,), daemon=True)
+            save_thread.start()
+            return save_thread
         except Exception as e:
             self.log_error(f"Error saving application settings: {str(e)}")
+            return None
+
+    def _save_app_settings_thread(self, settings: dict):
+        # Serialize writers so two quick saves cannot interleave in the same file
+        with self._settings_lock:
+            try:
+                if self.config_manager.save_app_settings(settings):
+                    self.log_info("Application settings saved.")
+                    return
+            except Exception as e:
+                self.log_error(f"Error saving application settings: {str(e)}")
+            # The write failed, so make the next save try again even if nothing else changes
+            self._persisted_app_settings = None
 
     def on_closing(self):
         """Handles window closing event."""
-        self.save_app_settings()
+        # Flush right away instead of waiting for the debounce timer
+        if self._settings_after_id is not None:
+            self.root.after_cancel(self._settings_after_id)
+        save_thread = self._flush_settings_now()
+        if save_thread:
+            # Give the write a moment to flush without holding up the shutdown
+            save_thread.join(timeout=0.5)
         self.root.destroy()
     
+    def _selected_mappings(self) -> dict:
+        """Returns {source column: destination column} for every row with a destination selected."""
+        mappings = {}
+        for source_col, combo in self.mapping_combos.items():
+            # One Tcl round-trip per combobox
+            dest_col = combo.get()
+            if dest_col:
+                mappings[source_col] = dest_col
+        return mappings
+
     def execute_transfer(self):
         if not self.source_file.get() or not self.dest_file.get():
             show_custom_warning(self.root, self, "Warning", "Please select both source and destination files.")
@@ -505,86 +752,154 @@ class ExcelDataMapper:
         if not hasattr(self, 'mapping_combos') or not self.mapping_combos:
             show_custom_warning(self.root, self, "Warning", "Please load columns first.")
             return
-        mappings = {s: c.get() for s, c in self.mapping_combos.items() if c.get()}
+        mappings = self._selected_mappings()
         if not mappings:
             show_custom_warning(self.root, self, "Warning", "Please configure at least one column mapping.")
             return
-        dest_values = list(mappings.values())
-        duplicates = [d for d in set(dest_values) if dest_values.count(d) > 1]
+        duplicates = [dest for dest, count in Counter(mappings.values()).items() if count > 1]
         if duplicates:
             show_custom_error(self.root, self, "Error", f"Duplicate destination columns detected: {', '.join(duplicates)}")
             return
-        if not self.check_file_accessibility(self.source_file.get()) or not self.check_file_accessibility(self.dest_file.get()):
+
+        # Read the Tk variables here on the GUI thread; the worker only receives plain values
+        try:
+            settings = self._collect_transfer_settings(mappings)
+        except tk.TclError as e:
+            show_custom_error(self.root, self, "Error", f"Transfer failed: {str(e)}")
             return
 
+        # File locks are detected by the worker when the engine opens the files,
+        # so the GUI thread does not pay for extra open round-trips here.
         self.disable_controls()
         self.update_status("Starting data transfer...")
         self.progress['value'] = 0
-        transfer_thread = Thread(target=self._execute_transfer_thread, args=(mappings,))
+        self._last_progress_value = None
+        self._cancel_event = Event()
+        self.cancel_button.configure(state=NORMAL)
+        transfer_thread = Thread(target=self._execute_transfer_thread, args=(settings, self._cancel_event))
         transfer_thread.daemon = True
         transfer_thread.start()
 
-    def _execute_transfer_thread(self, mappings):
-        try:
-            # 1. Collect all settings for the engine
-            settings = {
-                "source_file": self.source_file.get(),
-                "dest_file": self.dest_file.get(),
-                "source_header_start_row": self.source_header_start_row.get(),
-                "source_header_end_row": self.source_header_end_row.get(),
-                "dest_header_start_row": self.dest_header_start_row.get(),
-                "dest_header_end_row": self.dest_header_end_row.get(),
-                "dest_write_start_row": self.dest_write_start_row.get(),
-                "dest_write_end_row": self.dest_write_end_row.get(),
-                "dest_skip_rows": self.dest_skip_rows.get(),
-                "respect_cell_protection": self.respect_cell_protection.get(),
-                "respect_formulas": self.respect_formulas.get(),
-                "sort_column": self.sort_column.get(),
-                "mappings": mappings,
-                "source_columns": self.source_columns,
-                "dest_columns": self.dest_columns,
-            }
+    def _collect_transfer_settings(self, mappings: dict) -> dict:
+        """Collects all settings for the engine as plain Python values."""
+        return {
+            "source_file": self.source_file.get(),
+            "dest_file": self.dest_file.get(),
+            "source_header_start_row": self.source_header_start_row.get(),
+            "source_header_end_row": self.source_header_end_row.get(),
+            "dest_header_start_row": self.dest_header_start_row.get(),
+            "dest_header_end_row": self.dest_header_end_row.get(),
+            "dest_write_start_row": self.dest_write_start_row.get(),
+            "dest_write_end_row": self.dest_write_end_row.get(),
+            "dest_skip_rows": self.dest_skip_rows.get(),
+            "respect_cell_protection": self.respect_cell_protection.get(),
+            "respect_formulas": self.respect_formulas.get(),
+            "sort_column": self.sort_column.get(),
+            "mappings": mappings,
+            "source_columns": self.source_columns,
+            "dest_columns": self.dest_columns,
+        }
+
+    def cancel_transfer(self):
+        """Asks the running transfer to stop; the engine restores the destination from its backup."""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.cancel_button.configure(state=DISABLED)
+            self.update_status("Cancelling transfer...")
 
-            # 2. Create and run the engine
-            engine = ExcelTransferEngine(settings, self.update_progress_callback)
+    def _execute_transfer_thread(self, settings: dict, cancel_event: Event):
+        try:
+            # 1. Create and run the engine
+            engine = ExcelTransferEngine(settings, self.update_progress_callback, cancel_event)
             engine.run_transfer()
             
-            # 3. Update UI on success
+            # 2. Update UI on success
             self.root.after(0, self.on_transfer_success)
+        except TransferCancelled:
+            self.root.after(0, self.on_transfer_cancelled)
+        except OSError as e:
+            # Locked or missing files surface here instead of in a pre-check on the GUI thread
+            file_name = os.path.basename(e.filename) if e.filename else "the source or destination file"
+            friendly = OSError(f"Cannot access {file_name}. Make sure it exists and is not open in another program (e.g. Excel).\n\nDetails: {e}")
+            self.root.after(0, self.on_transfer_error, friendly)
         except Exception as e:
-            # 4. Update UI on error
+            # 3. Update UI on error
             self.root.after(0, self.on_transfer_error, e)
         finally:
-            # 5. ALWAYS release handles and re-enable controls
-            FileHandleManager.force_release_handles()
-            self.root.after(0, self.enable_controls)
+            # 4. ALWAYS re-enable controls; the engine and parsers close their own workbooks
+            self.root.after(0, self._on_transfer_finished)
+
+    def _on_transfer_finished(self):
+        self._cancel_event = None
+        self.cancel_button.configure(state=DISABLED)
+        self.enable_controls()
 
     def update_progress_callback(self, value: int, message: str):
-        """Callback function for the engine to update the GUI's progress."""
+        """
+        Callback function for the engine to update the GUI's progress.
+        It runs on the worker thread, so updates are queued and applied on the Tk main loop
+        by _drain_progress_queue, which coalesces bursts into a single repaint.
+        Updates that do not move the percentage are dropped so per-row calls cannot flood the queue.
+        """
+        if value == self._last_progress_value:
+            return
+        self._last_progress_value = value
+        self._progress_queue.put_nowait((value, message))
+
+    def _take_latest_progress(self):
+        """Empties the progress queue and returns the most recent update, if any."""
+        latest = None
+        try:
+            while True:
+                latest = self._progress_queue.get_nowait()
+        except queue.Empty:
+            pass
+        return latest
+
+    def _drain_progress_queue(self):
+        latest = self._take_latest_progress()
+        if latest:
+            self._apply_progress(*latest)
+        self.root.after(50, self._drain_progress_queue)
+
+    def _apply_progress(self, value: int, message: str):
         self.progress['value'] = value
         self.update_status(message)
-        self.root.update() # Use update, not update_idletasks, to force redraw
     
     def on_transfer_success(self):
+        self._take_latest_progress() # Drop stale updates so they cannot overwrite the final state
         self.progress['value'] = 100
         self.update_status("Transfer completed successfully")
         show_custom_info(self.root, self, "Success", "Data transfer completed successfully!")
         if show_custom_question(self.root, self, "Open Folder", "Would you like to open the destination folder?"):
             self.open_dest_folder()
 
+    def on_transfer_cancelled(self):
+        self._take_latest_progress()
+        self.update_status("Transfer cancelled")
+        self.progress['value'] = 0
+        show_custom_info(self.root, self, "Cancelled", "Transfer cancelled. The destination file was left unchanged.")
+
     def on_transfer_error(self, error):
         self.log_error(f"Error during transfer thread: {str(error)}\n{traceback.format_exc()}")
+        self._take_latest_progress()
         self.update_status("Transfer failed")
         self.progress['value'] = 0
         show_custom_error(self.root, self, "Error", f"Transfer failed: {str(error)}")
 
     def disable_controls(self):
-        for widget in [self.execute_button, self.load_button, self.save_button, self.load_cols_button, self.preview_button]:
-            widget.config(state=DISABLED)
+        self._set_controls_state(DISABLED)
 
     def enable_controls(self):
-        for widget in [self.execute_button, self.load_button, self.save_button, self.load_cols_button, self.preview_button]:
-            widget.config(state=NORMAL)
+        self._set_controls_state(NORMAL)
+
+    def _set_controls_state(self, state):
+        # Several paths enable the controls again in their cleanup; skip the Tcl calls when nothing changes
+        if state == self._controls_state:
+            return
+        for widget in self._controls:
+            widget.configure(state=state)
+        self._controls_state = state
     
     def toggle_theme(self):
         new_theme = "superhero" if self.current_theme == "flatly" else "flatly"
@@ -596,16 +911,17 @@ class ExcelDataMapper:
         if not self.dest_file.get():
             show_custom_warning(self.root, self, "Warning", "No destination file selected.")
             return
-        dest_path = Path(self.dest_file.get())
-        if dest_path.exists():
-            folder_path = dest_path.parent
+        dest_path = self.dest_file.get()
+        if stat_or_none(dest_path) is not None:
+            folder_path = Path(dest_path).parent
             try:
+                # Launch the file manager without waiting for it, so the window stays responsive
                 if os.name == 'nt':
                     os.startfile(folder_path)
                 elif sys.platform == 'darwin':
-                    subprocess.run(['open', folder_path])
+                    subprocess.Popen(['open', folder_path])
                 else:
-                    subprocess.run(['xdg-open', folder_path])
+                    subprocess.Popen(['xdg-open', folder_path])
             except Exception as e:
                 self.log_error(f"Could not open folder: {e}")
                 show_custom_error(self.root, self, "Error", f"Could not open folder:\n{e}")
@@ -615,8 +931,20 @@ class ExcelDataMapper:
     def show_about(self):
         AboutDialog(self.root, self)
     
-    def update_status(self, message):
+    def update_status(self, message, flush: bool = False):
+        """
+        Sets the status text. Repaints are coalesced to at most one per frame (~16 ms);
+        pass flush=True right before blocking work on the GUI thread so the message shows.
+        """
         self.status_label.config(text=message)
+        if flush:
+            self.root.update_idletasks()
+        elif not self._status_flush_pending:
+            self._status_flush_pending = True
+            self.root.after(16, self._flush_status)
+
+    def _flush_status(self):
+        self._status_flush_pending = False
         self.root.update_idletasks()
     
     def log_info(self, message): logging.info(message)
@@ -626,28 +954,40 @@ class ExcelDataMapper:
     def open_detection_config_dialog(self):
         DetectionConfigDialog(self.root, self)
 
+    def _compile_detection_keywords(self, *_):
+        """Rebuilds the end-row keyword pattern whenever the detection keywords change."""
+        self._keyword_re = compile_keyword_pattern(self.detection_keywords.get())
+
     def detect_write_zone(self):
-        if not self.dest_file.get() or not os.path.exists(self.dest_file.get()):
+        dest_path = self.dest_file.get()
+        if not dest_path or stat_or_none(dest_path) is None:
             show_custom_warning(self.root, self, "Warning", "Please select a valid destination file first.")
             return
         try:
-            self.update_status("Detecting write zone...")
+            self.update_status("Detecting write zone...", flush=True)
             predicted_start_row = self.dest_header_end_row.get() + 1
             self.dest_write_start_row.set(predicted_start_row)
             predicted_end_row = 0
-            with ExcelParser(self.dest_file.get()) as p:
-                ws = p.worksheet
-                keywords = [k.strip() for k in self.detection_keywords.get().lower().split(',') if k.strip()]
-                for row in range(predicted_start_row, ws.max_row + 1):
-                    for col in range(1, ws.max_column + 1):
-                        cell_val = ws.cell(row, col).value
-                        if isinstance(cell_val, str) and any(k in cell_val.lower() for k in keywords):
-                            predicted_end_row = row - 1; break
-                    if predicted_end_row > 0: break
-                if predicted_end_row == 0:
-                    for row in range(predicted_start_row, ws.max_row + 1):
-                        if all(ws.cell(row, col).value is None for col in range(1, ws.max_column + 1)):
+            first_empty_row = 0
+            keyword_re = self._keyword_re
+            # Stream the rows once: a keyword row wins, otherwise fall back to the first empty row
+            with ExcelParser(dest_path, read_only=True) as p:
+                for row, values in enumerate(p.iter_row_values(min_row=predicted_start_row), start=predicted_start_row):
+                    # Search the row's text as one string with the precompiled keyword pattern, so the
+                    # row is scanned once for all keywords. The newline separator keeps a keyword
+                    # from matching across two adjacent cells.
+                    if keyword_re:
+                        row_text = "\n".join(v for v in values if isinstance(v, str))
+                        if row_text and keyword_re.search(row_text):
                             predicted_end_row = row - 1; break
+                    # Cells holding an empty string count as blank, just like missing cells
+                    if not first_empty_row and not any(v is not None and v != "" for v in values):
+                        first_empty_row = row
+                        # Without keywords nothing later can change the result, so stop streaming
+                        if not keyword_re:
+                            break
+            if predicted_end_row == 0 and first_empty_row:
+                predicted_end_row = first_empty_row - 1
             if predicted_end_row >= predicted_start_row:
                 self.dest_write_end_row.set(predicted_end_row)
                 self.update_status(f"Detection complete. Start: {predicted_start_row}, End: {predicted_end_row}.")
@@ -659,75 +999,93 @@ class ExcelDataMapper:
             show_custom_error(self.root, self, "Error", f"Failed to detect write zone: {str(e)}")
             self.update_status("Detection failed")
 
-    def _run_preview_simulation(self):
+    def _run_preview_simulation(self, source_row_count: int):
         report = {}
-        try:
-            with ExcelParser(self.source_file.get()) as p:
-                report['source_row_count'] = p.count_data_rows(self.source_header_end_row.get())
-            with ExcelParser(self.dest_file.get()) as p:
-                ws = p.worksheet
-                start_row, end_row = self.dest_write_start_row.get(), self.dest_write_end_row.get()
-                if start_row <= self.dest_header_end_row.get():
-                    report["error"] = "Start Write Row must be after the destination header."
-                    return report
-                end_limit = end_row if end_row > 0 else ws.max_row
-                if end_row > 0 and start_row > end_row:
-                    report["error"] = "Start Write Row cannot be after End Write Row."
-                    return report
-                report.update({'start_row': start_row, 'end_row': end_row or "Unlimited", 'total_zone_rows': (end_limit - start_row + 1) if end_row > 0 else "Unlimited"})
-                
-                skipped_rows_set = parse_skip_rows_string(self.dest_skip_rows.get())
-                mappings = {s: c.get() for s, c in self.mapping_combos.items() if c.get()}
-                mapped_dest_indices = {self.dest_columns[name] for name in mappings.values() if name in self.dest_columns}
-
-                user_skipped, protected_skipped = 0, 0
+        report['source_row_count'] = source_row_count
+        start_row, end_row = self.dest_write_start_row.get(), self.dest_write_end_row.get()
+        if start_row <= self.dest_header_end_row.get():
+            report["error"] = "Start Write Row must be after the destination header."
+            return report
+        if end_row > 0 and start_row > end_row:
+            report["error"] = "Start Write Row cannot be after End Write Row."
+            return report
+
+        mappings = self._selected_mappings()
+        # Resolve the mapped destination column indices once, as a sorted tuple for the row loop
+        mapped_dest_indices = tuple(sorted({self.dest_columns[name] for name in mappings.values() if name in self.dest_columns}))
+        respect_protection = self.respect_cell_protection.get()
+        check_formulas = self.respect_formulas.get() and bool(mapped_dest_indices)
+        skipped_rows_set = parse_skip_rows_string(self.dest_skip_rows.get())
+
+        # Reuse the last scan of the destination when neither the file nor the zone settings changed
+        dest_path = self.dest_file.get()
+        stat = os.stat(dest_path)
+        signature = (stat.st_mtime_ns, stat.st_size, start_row, end_row, frozenset(skipped_rows_set),
+                     mapped_dest_indices, respect_protection, check_formulas)
+        cached = self._zone_scan_cache.get(dest_path)
+        if cached and cached[0] == signature:
+            end_limit, protected_skipped = cached[1]
+        else:
+            end_limit, protected_skipped = self._scan_dest_zone(dest_path, start_row, end_row, skipped_rows_set,
+                                                                mapped_dest_indices, respect_protection, check_formulas)
+            self._zone_scan_cache[dest_path] = (signature, (end_limit, protected_skipped))
+
+        report.update({'start_row': start_row, 'end_row': end_row or "Unlimited", 'total_zone_rows': (end_limit - start_row + 1) if end_row > 0 else "Unlimited"})
+        # Count user-skipped rows from the (small) skip set instead of walking the whole zone
+        user_skipped = sum(1 for r in skipped_rows_set if start_row <= r <= end_limit)
+        report.update({'user_skipped_count': user_skipped, 'protected_skipped_count': protected_skipped})
+        if end_row > 0:
+            report['available_slots'] = max(0, report['total_zone_rows'] - user_skipped - protected_skipped)
+        else:
+            report['available_slots'] = "Unlimited"
+        return report
+
+    def _scan_dest_zone(self, dest_path, start_row, end_row, skipped_rows_set, mapped_dest_indices,
+                        respect_protection, check_formulas):
+        """Opens the destination and returns (last zone row, rows skipped by protection or formulas)."""
+        # Protection and formula checks need cell styles and types, which only a full load has.
+        # Without them only the zone bounds are read, so the destination is opened read-only.
+        with ExcelParser(dest_path, read_only=not (respect_protection or check_formulas)) as p:
+            ws = p.worksheet
+            end_limit = end_row if end_row > 0 else p.get_max_row()
+            protected_skipped = 0
+            check_protection = respect_protection and ws.protection.sheet
+            # Only walk the zone cell by cell when a per-cell rule can actually skip a row
+            if check_protection or check_formulas:
+                cell = ws.cell
                 for r in range(start_row, end_limit + 1):
                     if r in skipped_rows_set:
-                        user_skipped += 1
                         continue
-                    
-                    # Check for protected cells or formulas in the row
-                    is_row_auto_skipped = False
-                    if self.respect_cell_protection.get() and ws.protection.sheet:
-                        # A row is considered skipped if ANY of its destination cells are locked
-                        if any(ws.cell(r, c_idx).protection.locked for c_idx in mapped_dest_indices):
-                            is_row_auto_skipped = True
-                    
-                    # A row is also considered skipped if ALL of its mapped destination cells contain formulas
-                    if self.respect_formulas.get():
-                        if mapped_dest_indices and all(ws.cell(r, c_idx).data_type == 'f' for c_idx in mapped_dest_indices):
-                             is_row_auto_skipped = True
 
-                    if is_row_auto_skipped:
+                    # A row is considered skipped if ANY of its destination cells are locked
+                    if check_protection and any(cell(r, c_idx).protection.locked for c_idx in mapped_dest_indices):
                         protected_skipped += 1
-
-                report.update({'user_skipped_count': user_skipped, 'protected_skipped_count': protected_skipped})
-                if end_row > 0:
-                    report['available_slots'] = max(0, report['total_zone_rows'] - user_skipped - protected_skipped)
-                else:
-                    report['available_slots'] = "Unlimited"
-            return report
-        finally:
-            FileHandleManager.force_release_handles()
+                    # A row is also considered skipped if ALL of its mapped destination cells contain formulas
+                    elif check_formulas and all(cell(r, c_idx).data_type == 'f' for c_idx in mapped_dest_indices):
+                        protected_skipped += 1
+            return end_limit, protected_skipped
 
     def preview_transfer(self):
-        if not all([self.source_file.get(), os.path.exists(self.source_file.get()), self.dest_file.get(), os.path.exists(self.dest_file.get())]):
+        source_path, dest_path = self.source_file.get(), self.dest_file.get()
+        if not (source_path and dest_path and os.path.isfile(source_path) and os.path.isfile(dest_path)):
             show_custom_error(self.root, self, "Error", "Please select valid source and destination files.")
             return
         if not hasattr(self, 'mapping_combos') or not self.source_columns:
             show_custom_warning(self.root, self, "Warning", "Please load columns first.")
             return
-        self.update_status("Generating simulation report...")
+        self.update_status("Generating simulation report...", flush=True)
         try:
-            report_data = self._run_preview_simulation()
+            mappings = self._selected_mappings()
+            # Count the source rows and read the preview rows in one streamed pass
+            with ExcelParser(source_path, read_only=True) as source_parser:
+                source_row_count, preview_data = source_parser.count_and_preview_rows(
+                    self.source_columns, self.source_header_end_row.get(), 10)
+            report_data = self._run_preview_simulation(source_row_count)
             if "error" in report_data:
                 PreviewDialog(self.root, self, report_data, [], {}); return
-            mappings = {s: c.get() for s, c in self.mapping_combos.items() if c.get()}
             if not mappings:
                 show_custom_warning(self.root, self, "Warning", "Please configure at least one mapping for a meaningful preview.")
                 return
-            with ExcelParser(self.source_file.get()) as p:
-                preview_data = p.read_data_preview(self.source_columns, self.source_header_end_row.get(), 10)
             report_data['settings'] = self.get_current_settings()
             PreviewDialog(self.root, self, report_data, preview_data, mappings)
             self.update_status("Preview report generated.")
@@ -736,14 +1094,19 @@ class ExcelDataMapper:
             show_custom_error(self.root, self, "Error", f"Failed to generate preview: {str(e)}")
             self.update_status("Preview failed")
 
+    def _invalidate_settings_cache(self, *_):
+        self._settings_cache.clear()
+
     def get_current_settings(self) -> dict:
-        return {
-            "Source File": os.path.basename(self.source_file.get()), "Destination File": os.path.basename(self.dest_file.get()),
-            "Sort Column": self.sort_column.get() or "None", "---": "---",
-            "Start Write Row": self.dest_write_start_row.get(), "End Write Row": self.dest_write_end_row.get() or "Unlimited",
-            "Skip Rows": self.dest_skip_rows.get() or "None", "Respect Protection": "Yes" if self.respect_cell_protection.get() else "No",
-            "Respect Formulas": "Yes" if self.respect_formulas.get() else "No",
-        }
+        if not self._settings_cache:
+            self._settings_cache.update({
+                "Source File": os.path.basename(self.source_file.get()), "Destination File": os.path.basename(self.dest_file.get()),
+                "Sort Column": self.sort_column.get() or "None", "---": "---",
+                "Start Write Row": self.dest_write_start_row.get(), "End Write Row": self.dest_write_end_row.get() or "Unlimited",
+                "Skip Rows": self.dest_skip_rows.get() or "None", "Respect Protection": "Yes" if self.respect_cell_protection.get() else "No",
+                "Respect Formulas": "Yes" if self.respect_formulas.get() else "No",
+            })
+        return dict(self._settings_cache)
     
     def run(self):
         try:
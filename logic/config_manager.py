@@ -1,6 +1,7 @@
 """
 Manages loading and saving of application and job-specific configurations.
 """
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -8,6 +9,9 @@ from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
 
+# Number of header layouts kept on disk; older entries are pruned when a new one is written
+HEADER_CACHE_LIMIT = 50
+
 class ConfigurationManager:
     """Handles reading and writing of configuration files."""
 
@@ -15,6 +19,7 @@ class ConfigurationManager:
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(exist_ok=True)
         self.app_settings_path = self.config_dir / "app_settings.json"
+        self.header_cache_dir = self.config_dir / ".header_cache"
 
     def get_default_app_settings(self) -> Dict[str, Any]:
         """Returns a dictionary with default application settings."""
@@ -33,25 +38,75 @@ class ConfigurationManager:
         if not self.app_settings_path.exists():
             return self.get_default_app_settings()
         try:
-            with open(self.app_settings_path, 'r', encoding='utf-8') as f:
-                settings = json.load(f)
-                # Ensure all keys are present, add defaults for missing ones
-                defaults = self.get_default_app_settings()
-                for key, value in defaults.items():
-                    if key not in settings:
-                        settings[key] = value
-                return settings
-        except (json.JSONDecodeError, IOError) as e:
+            # Read the whole file in one buffered call; json decodes the UTF-8 bytes itself
+            with open(self.app_settings_path, 'rb', buffering=65536) as f:
+                settings = json.loads(f.read())
+            # Ensure all keys are present, add defaults for missing ones
+            defaults = self.get_default_app_settings()
+            for key, value in defaults.items():
+                if key not in settings:
+                    settings[key] = value
+            return settings
+        except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
             logging.warning(f"Could not load app settings from {self.app_settings_path}: {e}. Returning defaults.")
             return self.get_default_app_settings()
 
-    def save_app_settings(self, settings: Dict[str, Any]):
-        """Saves global application settings."""
+    def _write_json_atomic(self, file_path, data: Dict[str, Any]):
+        """
+        Writes data as JSON to a temporary file next to the target and swaps it in with os.replace,
+        so a crash or full disk mid-write never leaves a truncated configuration behind.
+        """
+        tmp_path = f"{file_path}.tmp"
         try:
-            with open(self.app_settings_path, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def save_app_settings(self, settings: Dict[str, Any]) -> bool:
+        """Saves global application settings. Returns True when the file was written."""
+        try:
+            self._write_json_atomic(self.app_settings_path, settings)
+            return True
         except IOError as e:
             logging.error(f"Could not save app settings to {self.app_settings_path}: {e}")
+            return False
+
+    def _header_cache_path(self, key: str) -> Path:
+        return self.header_cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def load_cached_headers(self, key: str) -> Optional[Dict[str, int]]:
+        """
+        Returns the header layout (column name -> index) stored under key, or None if there is none.
+        The key should identify the file version and header rows, e.g. path, mtime, size and rows.
+        """
+        try:
+            with open(self._header_cache_path(key), 'rb') as f:
+                entry = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, UnicodeDecodeError, IOError) as e:
+            logging.warning(f"Ignoring unreadable header cache entry: {e}")
+            return None
+        # The full key is stored alongside, so a hash collision can never return another file's headers
+        if not isinstance(entry, dict) or entry.get("key") != key or not isinstance(entry.get("columns"), dict):
+            return None
+        return entry["columns"]
+
+    def save_cached_headers(self, key: str, columns: Dict[str, int]):
+        """Stores a header layout under key and prunes the oldest entries beyond HEADER_CACHE_LIMIT."""
+        try:
+            self.header_cache_dir.mkdir(exist_ok=True)
+            self._write_json_atomic(self._header_cache_path(key), {"key": key, "columns": columns})
+            entries = sorted(self.header_cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+            for stale in entries[HEADER_CACHE_LIMIT:]:
+                stale.unlink()
+        except IOError as e:
+            # The cache is only an optimization; a failed write must not fail the column load
+            logging.warning(f"Could not update header cache: {e}")
 
     def load_job_config(self, file_path: str) -> Dict[str, Any]:
         """Loads a job-specific configuration from a given path."""
@@ -66,8 +121,7 @@ class ConfigurationManager:
         """Saves a job-specific configuration to a given path."""
         try:
             settings["created_date"] = datetime.now().isoformat()
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            self._write_json_atomic(file_path, settings)
         except IOError as e:
             logging.error(f"Failed to save job configuration to {file_path}: {e}")
             raise e # Re-raise to be caught by the UI layer
\ No newline at end of file
@@ -2,35 +2,49 @@
 Handles intelligent column mapping suggestions between source and destination columns.
 """
 import re
-from typing import List, Set
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Various whitespace characters and separators, collapsed to a single space
+_SEPARATOR_RE = re.compile(r'[\s\u3000_\-]+')
+# Common bracketing characters, removed
+_BRACKET_RE = re.compile(r'[()\[\]{}]')
+
+@lru_cache(maxsize=1024)
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Normalized token set of a header; cached because the same names are scored on every reload."""
+    text = _SEPARATOR_RE.sub(' ', text)
+    text = _BRACKET_RE.sub('', text)
+    return frozenset(text.lower().strip().split())
 
 class ColumnMapper:
     """Provides methods to suggest column mappings based on name similarity."""
 
-    def _normalize_and_tokenize(self, text: str) -> Set[str]:
+    # A map of common keywords to boost scores for semantic matches
+    KEYWORDS_MAP = {
+        'content': 'contents', 'purpose': 'purpose', 'amount': 'amount',
+        'vat': 'vat', 'currency': 'currency', 'date': 'trading date',
+        'no': 'no.', 'number': 'no.', 'code': 'code reference', 'total': 'sub total'
+    }
+
+    def _normalize_and_tokenize(self, text: str) -> FrozenSet[str]:
         """
         Normalizes a column header string by converting it to lowercase,
         removing special characters, and splitting it into a set of words (tokens).
         """
-        # Replace various whitespace characters and separators with a single space
-        text = re.sub(r'[\s\u3000_\-]+', ' ', text)
-        # Remove common bracketing characters
-        text = re.sub(r'[()\[\]{}]', '', text)
-        return set(text.lower().strip().split())
+        return _tokenize(text)
 
-    def suggest_mapping(self, source_col: str, dest_cols: List[str]) -> str:
-        """
-        Suggests the best matching destination column for a given source column
-        using a scoring-based algorithm.
-
-        Args:
-            source_col: The name of the source column.
-            dest_cols: A list of available destination column names.
+    def _prepare_dest_columns(self, dest_cols: Iterable[str]) -> List[Tuple[str, FrozenSet[str], str]]:
+        """Tokenizes each destination column once into (name, tokens, normalized string) entries."""
+        entries = []
+        for dest_col in dest_cols:
+            dest_tokens = self._normalize_and_tokenize(dest_col)
+            if dest_tokens:
+                entries.append((dest_col, dest_tokens, "".join(sorted(dest_tokens))))
+        return entries
 
-        Returns:
-            The name of the best matching destination column, or an empty string if no
-            suitable match is found.
-        """
+    def _best_match(self, source_col: str, dest_entries: List[Tuple[str, FrozenSet[str], str]]) -> str:
+        """Scores a source column against prepared destination entries and returns the best one."""
         # Do not suggest mappings for unnamed or generic source columns
         if str(source_col).startswith('Column_'):
             return ""
@@ -39,21 +53,14 @@ class ColumnMapper:
         if not source_tokens:
             return ""
 
+        source_norm_str = "".join(sorted(source_tokens))
+        source_keywords = [value for key, value in self.KEYWORDS_MAP.items() if key in source_tokens]
+
         best_match = ""
         max_score = 0
 
-        # A map of common keywords to boost scores for semantic matches
-        keywords_map = {
-            'content': 'contents', 'purpose': 'purpose', 'amount': 'amount',
-            'vat': 'vat', 'currency': 'currency', 'date': 'trading date',
-            'no': 'no.', 'number': 'no.', 'code': 'code reference', 'total': 'sub total'
-        }
-
-        for dest_col in dest_cols:
+        for dest_col, dest_tokens, dest_norm_str in dest_entries:
             current_score = 0
-            dest_tokens = self._normalize_and_tokenize(dest_col)
-            if not dest_tokens:
-                continue
 
             # Perfect match gives a very high score
             if source_tokens == dest_tokens:
@@ -64,13 +71,11 @@ class ColumnMapper:
             current_score += len(common_tokens) * 50
 
             # Boost score for known keyword synonyms
-            for key, value in keywords_map.items():
-                if key in source_tokens and value in dest_tokens:
+            for value in source_keywords:
+                if value in dest_tokens:
                     current_score += 40
 
             # Boost score if one name is a substring of the other (after normalization)
-            source_norm_str = "".join(sorted(list(source_tokens)))
-            dest_norm_str = "".join(sorted(list(dest_tokens)))
             if source_norm_str in dest_norm_str or dest_norm_str in source_norm_str:
                 current_score += 20
 
@@ -79,3 +84,39 @@ class ColumnMapper:
                 best_match = dest_col
 
         return best_match
+
+    def suggest_mapping(self, source_col: str, dest_cols: List[str]) -> str:
+        """
+        Suggests the best matching destination column for a given source column
+        using a scoring-based algorithm.
+
+        Args:
+            source_col: The name of the source column.
+            dest_cols: A list of available destination column names.
+
+        Returns:
+            The name of the best matching destination column, or an empty string if no
+            suitable match is found.
+        """
+        return self._best_match(source_col, self._prepare_dest_columns(dest_cols))
+
+    def suggest_all(self, source_cols: Iterable[str], dest_cols: Iterable[str]) -> Dict[str, str]:
+        """
+        Suggests mappings for many source columns at once. Destination columns are
+        tokenized a single time and shared by every source column.
+
+        Args:
+            source_cols: The names of the source columns.
+            dest_cols: The available destination column names.
+
+        Returns:
+            A dict of source column name to suggested destination column name. Source
+            columns without a suitable match are omitted.
+        """
+        dest_entries = self._prepare_dest_columns(dest_cols)
+        suggestions = {}
+        for source_col in source_cols:
+            suggested = self._best_match(source_col, dest_entries)
+            if suggested:
+                suggestions[source_col] = suggested
+        return suggestions
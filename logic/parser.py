@@ -7,23 +7,34 @@ from typing import List, Dict, Any, Optional, Tuple
 import logging
 from pathlib import Path
 import gc
+import weakref
 
 class ExcelParser:
     """Handles parsing of Excel files with complex structures and proper resource management"""
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, read_only: bool = False):
         self.file_path = Path(file_path)
+        self.read_only = read_only
         self.workbook = None
         self.worksheet = None
+        self._finalizer = None
         
     def __enter__(self):
         """Context manager entry"""
         try:
-            # Force garbage collection before opening
-            gc.collect()
-            
-            self.workbook = openpyxl.load_workbook(self.file_path, data_only=True)
+            # Read-only mode streams rows from the sheet XML instead of building the full cell tree.
+            # It is much faster for scanning, but merged cells and cell styles are not available.
+            # The parser never saves, so macros and external link parts are skipped as well.
+            self.workbook = openpyxl.load_workbook(self.file_path, read_only=self.read_only, data_only=True,
+                                                   keep_vba=False, keep_links=False)
+            # Closes the workbook if this parser is dropped without __exit__/_cleanup running,
+            # so no global garbage collection is needed to release the file handle
+            self._finalizer = weakref.finalize(self, ExcelParser._close_workbook, self.workbook, self.file_path)
             self.worksheet = self.workbook.active
+            if self.read_only:
+                # Read-only sheets otherwise trust the stored <dimension> record, which some tools write wrong,
+                # and silently stop at it; after the reset max_row/max_column are None and rows vary in width
+                self.worksheet.reset_dimensions()
             return self
         except Exception as e:
             # Ensure cleanup on initialization failure
@@ -34,18 +45,25 @@ class ExcelParser:
         """Context manager exit with guaranteed cleanup"""
         self._cleanup()
         
+    @staticmethod
+    def _close_workbook(workbook, file_path):
+        try:
+            workbook.close()
+        except Exception as e:
+            logging.warning(f"Error closing workbook for {file_path}: {e}")
+
     def _cleanup(self):
         """Guaranteed cleanup method"""
         try:
-            if self.workbook:
-                self.workbook.close()
-        except Exception as e:
-            logging.warning(f"Error closing workbook for {self.file_path}: {e}")
+            if self._finalizer:
+                # Runs the close at most once and detaches it from the parser
+                self._finalizer()
+            elif self.workbook:
+                ExcelParser._close_workbook(self.workbook, self.file_path)
         finally:
+            self._finalizer = None
             self.workbook = None
             self.worksheet = None
-            # Force garbage collection after cleanup
-            gc.collect()
     
     def get_headers(self, start_row: int, end_row: int, max_columns: Optional[int] = None) -> Dict[str, int]:
         """
@@ -66,16 +84,26 @@ class ExcelParser:
             raise ValueError(f"Header start row ({start_row}) cannot be after end row ({end_row}).")
 
         max_col = max_columns or self.worksheet.max_column
-        merged_ranges = list(self.worksheet.merged_cells.ranges)  # Convert to list to avoid iteration issues
+        # Read the header block as plain value tuples in one pass instead of one ws.cell() per cell
+        header_block = list(self.worksheet.iter_rows(min_row=start_row, max_row=end_row, max_col=max_col, values_only=True))
+        if max_col is None:
+            # Read-only sheets have no dimension after reset_dimensions(); take the width from the rows read
+            max_col = max((len(row_values) for row_values in header_block), default=0)
+        merged_values = self._get_merged_header_values(start_row, end_row, max_col)
         raw_headers = []
 
         for col in range(1, max_col + 1):
             header_parts = []
             # Iterate through all rows in the defined header block
-            for row in range(start_row, end_row + 1):
-                cell_value = self._get_cell_value_with_merges(row, col, merged_ranges)
-                if cell_value:
-                    header_parts.append(cell_value)
+            for row, row_values in enumerate(header_block, start=start_row):
+                cell_value = row_values[col - 1] if col <= len(row_values) else None
+                if cell_value is None:
+                    # Empty cells inside a merged range take the value of the range's top-left cell
+                    cell_value = merged_values.get((row, col))
+                if cell_value is not None:
+                    cell_value = str(cell_value).strip()
+                    if cell_value:
+                        header_parts.append(cell_value)
             
             # Join the parts to form the final header name for the column
             final_header = ""
@@ -96,28 +124,27 @@ class ExcelParser:
         
         return unique_columns
     
-    def _get_cell_value_with_merges(self, row: int, col: int, merged_ranges) -> str:
-        """Get cell value, handling merged cells"""
-        try:
-            cell = self.worksheet.cell(row=row, column=col)
-            cell_value = cell.value
-            
-            if cell_value is not None:
-                return str(cell_value).strip()
-            
-            # Check if cell is part of a merged range
-            cell_coordinate = cell.coordinate
-            for merged_range in merged_ranges:
-                if cell_coordinate in merged_range:
-                    # Get the top-left cell of the merged range
-                    top_left = self.worksheet.cell(merged_range.min_row, merged_range.min_col)
-                    if top_left.value is not None:
-                        return str(top_left.value).strip()
-            
-            return ""
-        except Exception as e:
-            logging.warning(f"Error reading cell ({row}, {col}) from {self.file_path}: {e}")
-            return ""
+    def _get_merged_header_values(self, start_row: int, end_row: int, max_col: int) -> Dict[Tuple[int, int], Any]:
+        """
+        Maps every (row, col) of the header block that lies inside a merged range
+        to the value of that range's top-left cell.
+        """
+        merged_values = {}
+        merged_cells = getattr(self.worksheet, 'merged_cells', None)
+        if merged_cells is None:
+            # Read-only worksheets do not expose merged ranges
+            return merged_values
+
+        for merged_range in merged_cells.ranges:
+            if merged_range.max_row < start_row or merged_range.min_row > end_row or merged_range.min_col > max_col:
+                continue
+            top_left_value = self.worksheet.cell(merged_range.min_row, merged_range.min_col).value
+            if top_left_value is None:
+                continue
+            for row in range(max(start_row, merged_range.min_row), min(end_row, merged_range.max_row) + 1):
+                for col in range(merged_range.min_col, min(max_col, merged_range.max_col) + 1):
+                    merged_values.setdefault((row, col), top_left_value)
+        return merged_values
     
     def get_data_rows(self, header_row: int, headers: List[str]) -> List[Dict[str, Any]]:
         """
@@ -135,32 +162,18 @@ class ExcelParser:
         
         data = []
         start_row = header_row + 2
+        width = len(headers)
+        if not width:
+            return data
         
-        for row in range(start_row, self.worksheet.max_row + 1):
-            row_data = {}
-            has_data = False
-            
-            for col, header in enumerate(headers, start=1):
-                cell = self.worksheet.cell(row=row, column=col)
-                value = cell.value
-                
-                if value is not None:
-                    has_data = True
-                    
-                    # Preserve data types
-                    if cell.data_type == 'n':  # Number
-                        # Keep original number format
-                        row_data[header] = value
-                    elif cell.data_type == 'd':  # Date
-                        row_data[header] = value
-                    else:
-                        row_data[header] = value
-                else:
-                    row_data[header] = None
-            
+        # Stream value tuples up to the last stored row instead of probing every cell up to max_row with ws.cell(),
+        # which creates empty cells in normal mode and re-reads the sheet on each call in read-only mode
+        for row_values in self.worksheet.iter_rows(min_row=start_row, max_col=width, values_only=True):
             # Only add row if it contains data
-            if has_data:
-                data.append(row_data)
+            if any(value is not None for value in row_values):
+                # Streamed rows can be shorter than the header width when trailing cells are empty
+                row_values = row_values + (None,) * (width - len(row_values))
+                data.append(dict(zip(headers, row_values)))
         
         return data
     
@@ -192,21 +205,24 @@ class ExcelParser:
         
         best_row = 1
         best_score = 0
+        # max_row/max_column rescan every cell in openpyxl, so read them once
+        max_col = self.worksheet.max_column
         
         for row in range(1, min(max_search_rows + 1, self.worksheet.max_row + 1)):
-            score = self._calculate_header_score(row)
+            score = self._calculate_header_score(row, max_col)
             if score > best_score:
                 best_score = score
                 best_row = row
         
         return best_row
     
-    def _calculate_header_score(self, row: int) -> float:
+    def _calculate_header_score(self, row: int, max_col: Optional[int] = None) -> float:
         """Calculate likelihood that a row contains headers"""
         score = 0
         total_cells = 0
+        max_col = max_col or self.worksheet.max_column
         
-        for col in range(1, min(20, self.worksheet.max_column + 1)):  # Check first 20 columns
+        for col in range(1, min(20, max_col + 1)):  # Check first 20 columns
             cell = self.worksheet.cell(row=row, column=col)
             total_cells += 1
             
@@ -248,7 +264,7 @@ class ExcelParser:
             # Try to open the file temporarily for validation
             temp_workbook = None
             try:
-                temp_workbook = openpyxl.load_workbook(self.file_path, data_only=True)
+                temp_workbook = openpyxl.load_workbook(self.file_path, data_only=True, keep_links=False)
                 ws = temp_workbook.active
                 
                 if ws.max_row == 1:
@@ -295,17 +311,17 @@ class ExcelParser:
         headers = self.get_headers(header_row, header_row)
         column_types = {}
         
-        # Sample first 100 data rows
-        sample_size = min(100, self.worksheet.max_row - header_row)
+        # Sample first 100 data rows, read as one bounded block that stops after the sample
+        sample_end_row = min(header_row + 100, self.worksheet.max_row)
+        sample_rows = []
+        if headers and sample_end_row > header_row:
+            sample_rows = list(self.worksheet.iter_rows(min_row=header_row + 1, max_row=sample_end_row, max_col=len(headers)))
         
         for col, header in enumerate(headers, start=1):
             type_counts = {'text': 0, 'number': 0, 'date': 0, 'empty': 0}
             
-            for row in range(header_row + 1, header_row + 1 + sample_size):
-                if row > self.worksheet.max_row:
-                    break
-                    
-                cell = self.worksheet.cell(row=row, column=col)
+            for row_cells in sample_rows:
+                cell = row_cells[col - 1]
                 
                 if cell.value is None:
                     type_counts['empty'] += 1
@@ -336,6 +352,29 @@ class ExcelParser:
                 count += 1
         return count
 
+    def get_max_row(self) -> int:
+        """
+        Returns the last used row of the worksheet. Read-only sheets have their stored dimension
+        reset on open (it can be wrong), so they are measured by streaming the rows once.
+        """
+        if not self.worksheet:
+            raise ValueError("Worksheet not loaded")
+        max_row = self.worksheet.max_row
+        if max_row is None:
+            max_row = 0
+            for max_row, _ in enumerate(self.worksheet.iter_rows(values_only=True), start=1):
+                pass
+        return max_row
+
+    def iter_row_values(self, min_row: int = 1, max_row: Optional[int] = None):
+        """
+        Yields the values of each row as a tuple, starting at min_row.
+        Rows are streamed when the parser is opened with read_only=True.
+        """
+        if not self.worksheet:
+            raise ValueError("Worksheet not loaded")
+        return self.worksheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True)
+
     def read_data_preview(self, headers: Dict[str, int], header_end_row: int, num_rows: int) -> List[Dict[str, Any]]:
         """Reads a specified number of data rows for preview."""
         if not self.worksheet:
@@ -344,11 +383,13 @@ class ExcelParser:
         data = []
         start_data_row = header_end_row + 1
         
-        for row_index in range(start_data_row, min(start_data_row + num_rows, self.worksheet.max_row + 1)):
+        # Read whole rows with iter_rows so this also works on a streaming (read-only) worksheet,
+        # where ws.cell() would re-parse the sheet for every call
+        for row_values in self.iter_row_values(start_data_row, start_data_row + num_rows - 1):
             row_data = {}
             has_data = False
             for header_name, col_index in headers.items():
-                cell_value = self.worksheet.cell(row=row_index, column=col_index).value
+                cell_value = row_values[col_index - 1] if col_index <= len(row_values) else None
                 if cell_value is not None:
                     has_data = True
                 row_data[header_name] = cell_value
@@ -358,6 +399,26 @@ class ExcelParser:
         
         return data
 
+    def count_and_preview_rows(self, headers: Dict[str, int], header_end_row: int, num_rows: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Counts the non-empty data rows and reads the first num_rows rows for preview in a single
+        streamed pass. Returns the same values as count_data_rows and read_data_preview.
+        """
+        if not self.worksheet:
+            raise ValueError("Worksheet not loaded")
+
+        count = 0
+        preview = []
+        for offset, row_values in enumerate(self.iter_row_values(header_end_row + 1)):
+            if any(cell is not None for cell in row_values):
+                count += 1
+            if offset < num_rows:
+                row_data = {header_name: row_values[col_index - 1] if col_index <= len(row_values) else None
+                            for header_name, col_index in headers.items()}
+                if any(value is not None for value in row_data.values()):
+                    preview.append(row_data)
+        return count, preview
+
 # Utility functions for external use with enhanced resource management
 def quick_validate_excel(file_path: str) -> bool:
     """Quick validation of Excel file with proper cleanup"""
@@ -6,9 +6,13 @@ import openpyxl
 import shutil
 from pathlib import Path
 import logging
-from typing import List, Dict, Any, Optional, Callable, Set
+from threading import Event
+from typing import List, Dict, Any, Optional, Callable, Set, Tuple
 from openpyxl.cell.cell import MergedCell
 
+class TransferCancelled(Exception):
+    """Raised when a running transfer is cancelled; the destination file is restored from its backup."""
+
 def parse_skip_rows_string(skip_rows_str: str) -> Set[int]:
     """
     Parses a user-provided string of rows to skip into a set of integers.
@@ -46,7 +50,8 @@ class ExcelTransferEngine:
     Handles the entire data transfer process from a source to a destination Excel file.
     It takes a comprehensive settings dictionary to control its behavior.
     """
-    def __init__(self, settings: Dict[str, Any], progress_callback: Optional[Callable[[int, str], None]] = None):
+    def __init__(self, settings: Dict[str, Any], progress_callback: Optional[Callable[[int, str], None]] = None,
+                 cancel_event: Optional[Event] = None):
         self.source_path = Path(settings["source_file"])
         self.dest_path = Path(settings["dest_file"])
         self.source_header_end_row = settings["source_header_end_row"]
@@ -62,6 +67,8 @@ class ExcelTransferEngine:
         self.dest_columns = settings["dest_columns"]
 
         self.progress_callback = progress_callback
+        # Set from another thread to stop the transfer at the next checkpoint
+        self.cancel_event = cancel_event
         self.backup_path = None
 
     def _update_progress(self, value: int, message: str):
@@ -69,27 +76,42 @@ class ExcelTransferEngine:
         if self.progress_callback:
             self.progress_callback(value, message)
 
+    def _check_cancelled(self):
+        """Raises TransferCancelled if the caller has asked the transfer to stop."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise TransferCancelled("Transfer cancelled by user.")
+
     def run_transfer(self):
         """
         Executes the entire data transfer process: backup, read, sort, write, and cleanup.
         """
         self.backup_path = self.dest_path.with_suffix(f'.{self.dest_path.suffix}.backup')
         try:
-            shutil.copy2(self.dest_path, self.backup_path)
+            # The backup only lives for the duration of the transfer, so copy the contents without metadata
+            shutil.copyfile(self.dest_path, self.backup_path)
             logging.info(f"Backup created at {self.backup_path}")
 
+            self._check_cancelled()
             self._update_progress(10, "Reading source data...")
             source_data = self._read_source_data()
             if not source_data:
                 raise ValueError("No data found in source file. Please check the file and header settings.")
+            self._check_cancelled()
 
             if self.sort_column:
                 self._update_progress(30, "Sorting data...")
-                source_data.sort(key=lambda x: (
-                    x.get(self.sort_column) is None or str(x.get(self.sort_column, "")).strip() == "",
-                    str(x.get(self.sort_column, ""))
-                ))
+                sort_position = self._source_position(self.sort_column)
+                # A sort column that is not a source column gives every row the same key, so the order stays as read
+                if sort_position is not None:
+                    def sort_key(row):
+                        # One lookup and one str() per row; blank values sort last
+                        value = row[sort_position] if sort_position < len(row) else None
+                        text = str(value)
+                        return (value is None or text.strip() == "", text)
+
+                    source_data.sort(key=sort_key)
 
+            self._check_cancelled()
             self._update_progress(50, "Writing to destination...")
             self._write_to_destination(source_data)
 
@@ -98,40 +120,62 @@ class ExcelTransferEngine:
             self._update_progress(100, "Transfer completed successfully")
             logging.info("Data transfer completed successfully")
 
+        except TransferCancelled:
+            logging.info("Transfer cancelled by user")
+            self._restore_backup()
+            raise
         except Exception as e:
             logging.error(f"Transfer failed: {e}", exc_info=True)
-            if self.backup_path and self.backup_path.exists():
-                try:
-                    shutil.copy2(self.backup_path, self.dest_path)
-                    self.backup_path.unlink()
-                    logging.info("Restored destination file from backup.")
-                except Exception as backup_e:
-                    logging.error(f"CRITICAL: Failed to restore backup: {backup_e}", exc_info=True)
+            self._restore_backup()
             raise e
 
-    def _read_source_data(self) -> List[Dict[str, Any]]:
-        """Reads all data rows from the source file based on the source column definitions."""
+    def _restore_backup(self):
+        """Puts the destination file back from the backup taken at the start of the transfer."""
+        if self.backup_path and self.backup_path.exists():
+            try:
+                shutil.copy2(self.backup_path, self.dest_path)
+                self.backup_path.unlink()
+                logging.info("Restored destination file from backup.")
+            except Exception as backup_e:
+                logging.error(f"CRITICAL: Failed to restore backup: {backup_e}", exc_info=True)
+
+    def _source_position(self, source_col: str) -> Optional[int]:
+        """Returns the zero-based position of a source column in a row tuple, or None if it is not a source column."""
+        col_index = self.source_columns.get(source_col)
+        return None if col_index is None else col_index - 1
+
+    def _read_source_data(self) -> List[Tuple[Any, ...]]:
+        """
+        Reads all data rows from the source file based on the source column definitions.
+        Rows are kept as the value tuples streamed by openpyxl (indexed by column number - 1)
+        instead of one dict per row; rows can be shorter than the widest row.
+        """
         workbook = None
         try:
-            workbook = openpyxl.load_workbook(self.source_path, data_only=True)
+            # The source is only read, so stream it: read-only mode yields row tuples from the sheet XML
+            # instead of building every Cell object, and never re-parses the sheet per ws.cell() call.
+            # The source is never saved, so macros and external link parts are skipped as well
+            workbook = openpyxl.load_workbook(self.source_path, data_only=True, read_only=True,
+                                              keep_vba=False, keep_links=False)
             worksheet = workbook.active
+            # Read-only sheets trust the stored <dimension> record, which some tools write wrong; without the
+            # reset, rows and columns outside it are silently dropped. Rows then vary in width (see below)
+            worksheet.reset_dimensions()
             start_data_row = self.source_header_end_row + 1
+            # Zero-based tuple positions, resolved once for the row loop
+            column_positions = [col_index - 1 for col_index in self.source_columns.values()]
             data = []
-            for row_index in range(start_data_row, worksheet.max_row + 1):
-                row_data, has_data = {}, False
-                for header_name, col_index in self.source_columns.items():
-                    value = worksheet.cell(row=row_index, column=col_index).value
-                    if value is not None:
-                        has_data = True
-                    row_data[header_name] = value
-                if has_data:
-                    data.append(row_data)
+            for row_values in worksheet.iter_rows(min_row=start_data_row, values_only=True):
+                # Streamed rows can be shorter than the widest row when trailing cells are empty
+                row_length = len(row_values)
+                if any(row_values[position] is not None for position in column_positions if position < row_length):
+                    data.append(row_values)
             return data
         finally:
             if workbook:
                 workbook.close()
 
-    def _write_to_destination(self, source_data: List[Dict[str, Any]]):
+    def _write_to_destination(self, source_data: List[Tuple[Any, ...]]):
         """Writes the processed data to the destination file, respecting all write zone rules."""
         workbook = None
         try:
@@ -143,36 +187,63 @@ class ExcelTransferEngine:
             if self.dest_write_start_row <= self.dest_header_end_row:
                 raise ValueError("Start Write Row must be after the destination header rows.")
 
+            # Ranges do not change while writing, so resolve every merged position to its top-left anchor
+            # once instead of scanning all merged ranges for each merged cell that is cleared or written
+            merged_anchors = {}
+            for merged_range in worksheet.merged_cells.ranges:
+                anchor = (merged_range.min_row, merged_range.min_col)
+                for row in range(merged_range.min_row, merged_range.max_row + 1):
+                    for col in range(merged_range.min_col, merged_range.max_col + 1):
+                        merged_anchors.setdefault((row, col), anchor)
+
             def get_writable_cell(row_idx, col_idx):
                 cell = worksheet.cell(row=row_idx, column=col_idx)
                 if isinstance(cell, MergedCell):
-                    for merged_range in worksheet.merged_cells.ranges:
-                        if cell.coordinate in merged_range:
-                            return worksheet.cell(row=merged_range.min_row, column=merged_range.min_col)
+                    anchor = merged_anchors.get((row_idx, col_idx))
+                    if anchor:
+                        return worksheet.cell(row=anchor[0], column=anchor[1])
                 return cell
 
-            clear_until_row = self.dest_write_end_row if self.dest_write_end_row > 0 else worksheet.max_row + 50
+            # Only cells that already exist can hold a value to clear. Probing every (row, column) of the zone
+            # with worksheet.cell() (or iter_rows(), which does the same) would build an empty Cell object at each
+            # position, up to 50 rows past the end of the sheet. openpyxl has no public way to list existing
+            # cells, so read its cell store directly (the version is pinned in requirements.txt).
+            clear_until_row = self.dest_write_end_row if self.dest_write_end_row > 0 else worksheet.max_row
+            dest_col_nums = set(self.dest_columns.values())
+            cells_to_clear = [(row, col) for row, col in worksheet._cells
+                              if col in dest_col_nums and self.dest_write_start_row <= row <= clear_until_row
+                              and row not in skipped_rows]
             cleared_anchors = set()
-            for row_to_clear in range(self.dest_write_start_row, clear_until_row + 1):
-                if row_to_clear in skipped_rows:
-                    continue
-                for dest_col_num in self.dest_columns.values():
-                    anchor_cell = get_writable_cell(row_to_clear, dest_col_num)
-                    if (anchor_cell.row >= self.dest_write_start_row and 
-                            anchor_cell.coordinate not in cleared_anchors and 
-                            anchor_cell.row not in skipped_rows):
-                        if not (self.respect_formulas and anchor_cell.data_type == 'f'):
-                            anchor_cell.value = None
-                        cleared_anchors.add(anchor_cell.coordinate)
+            for row_to_clear, dest_col_num in cells_to_clear:
+                anchor_cell = get_writable_cell(row_to_clear, dest_col_num)
+                if (anchor_cell.row >= self.dest_write_start_row and 
+                        anchor_cell.coordinate not in cleared_anchors and 
+                        anchor_cell.row not in skipped_rows):
+                    if not (self.respect_formulas and anchor_cell.data_type == 'f'):
+                        anchor_cell.value = None
+                    cleared_anchors.add(anchor_cell.coordinate)
+
+            # Resolve the source positions and destination column numbers once; unknown destination columns
+            # are skipped, and an unknown source column (position None) writes an empty value
+            write_plan = [(self._source_position(source_col), self.dest_columns[dest_col])
+                          for source_col, dest_col in self.mappings.items() if dest_col in self.dest_columns]
 
             current_write_row = self.dest_write_start_row
             EXCEL_MAX_ROW = 1048576
             total_source_rows = len(source_data)
+            last_progress_value = None
+            # Loop invariants bound to locals once, so the per-row and per-cell code avoids repeated attribute lookups
+            write_end_row = self.dest_write_end_row
+            respect_formulas = self.respect_formulas
+            check_protection = bool(self.respect_cell_protection and worksheet.protection.sheet)
+            dest_col_nums_in_order = tuple(self.dest_columns.values())
+            get_anchor = merged_anchors.get
+            get_cell = worksheet.cell
 
             for i, row_data in enumerate(source_data):
                 while True:
-                    if self.dest_write_end_row > 0 and current_write_row > self.dest_write_end_row:
-                        logging.warning(f"Reached end of write zone (row {self.dest_write_end_row}). Stopping data transfer.")
+                    if write_end_row > 0 and current_write_row > write_end_row:
+                        logging.warning(f"Reached end of write zone (row {write_end_row}). Stopping data transfer.")
                         workbook.save(self.dest_path)
                         return
 
@@ -182,8 +253,8 @@ class ExcelTransferEngine:
                         raise RuntimeError(f"Reached maximum Excel row limit ({EXCEL_MAX_ROW}).")
                     
                     is_invalid_row = current_write_row in skipped_rows
-                    if not is_invalid_row and self.respect_cell_protection and worksheet.protection.sheet:
-                        for dest_col_num in self.dest_columns.values():
+                    if not is_invalid_row and check_protection:
+                        for dest_col_num in dest_col_nums_in_order:
                             if get_writable_cell(current_write_row, dest_col_num).protection.locked:
                                 is_invalid_row = True
                                 break
@@ -192,17 +263,37 @@ class ExcelTransferEngine:
                         break
                     current_write_row += 1
 
+                # Only report when the percentage moves: at most 45 callbacks instead of one per row
                 progress_value = 50 + int((i / total_source_rows) * 45)
-                self._update_progress(progress_value, f"Writing row {i+1}/{total_source_rows}")
-
-                for source_col, dest_col in self.mappings.items():
-                    if dest_col in self.dest_columns:
-                        dest_col_num = self.dest_columns[dest_col]
-                        cell_to_write = get_writable_cell(current_write_row, dest_col_num)
-                        if cell_to_write.row >= current_write_row and not (self.respect_formulas and cell_to_write.data_type == 'f'):
-                            cell_to_write.value = row_data.get(source_col)
+                if progress_value != last_progress_value:
+                    last_progress_value = progress_value
+                    # Checked at the same points, so a cancel request is seen within ~2% of the rows
+                    self._check_cancelled()
+                    self._update_progress(progress_value, f"Writing row {i+1}/{total_source_rows}")
+
+                row_length = len(row_data)
+                for source_position, dest_col_num in write_plan:
+                    # Resolve the target straight from the anchor map: a plain cell is written in place, the top row
+                    # of a merged range writes its anchor, and lower rows of a range (whose anchor sits above the
+                    # current row, e.g. a header merge reaching into the zone) are never written
+                    value = row_data[source_position] if source_position is not None and source_position < row_length else None
+                    anchor = get_anchor((current_write_row, dest_col_num))
+                    if anchor is None:
+                        # The clear phase already emptied every plain cell of the zone (or left a protected formula
+                        # alone), so writing None would only create an empty Cell object
+                        if value is None:
+                            continue
+                        cell_to_write = get_cell(current_write_row, dest_col_num)
+                    elif anchor[0] == current_write_row:
+                        # Columns sharing a horizontal merge all write its anchor, so even None must be written here
+                        cell_to_write = get_cell(anchor[0], anchor[1])
+                    else:
+                        continue
+                    if not (respect_formulas and cell_to_write.data_type == 'f'):
+                        cell_to_write.value = value
                 current_write_row += 1
             
+            self._check_cancelled()
             workbook.save(self.dest_path)
         finally:
             if workbook: